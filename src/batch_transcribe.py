@@ -5,11 +5,17 @@ Batch Transcription Script for Omi Audio Recorder
 Standalone script to transcribe all WAV files in the omi_recordings/
 directory without corresponding markdown files.
 
+Uses faster-whisper's BatchedInferencePipeline: the model is loaded
+once and audio is transcribed in parallel 30-second chunks, which is
+substantially faster than serial whisper on the short clips the
+session-based recorder produces.
+
 Usage:
     python batch_transcribe.py                    # Transcribe all new files
     python batch_transcribe.py --force           # Re-transcribe all files
     python batch_transcribe.py --dir path/to/dir # Use custom directory
     python batch_transcribe.py --model small     # Use different model size
+    python batch_transcribe.py --batch-size 16   # Larger inference batches
 
 Supported Whisper models:
     - tiny   (39M params, ~75MB)   - Fastest
@@ -19,19 +25,24 @@ Supported Whisper models:
     - large  (1550M params, ~2.9GB) - Most accurate
 """
 
+import os
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from transcribe import batch_transcribe as transcribe_batch
+from transcribe import generate_markdown, save_markdown
 
 # Default values - hardcoded defaults that always work
 DEFAULT_MODEL = "base"
 DEFAULT_RECORDINGS_DIR = "omi_recordings"
 DEFAULT_TRANSCRIPTS_DIR = "omi_recordings"
+DEFAULT_BATCH_SIZE = 8  # Safe for CPU and ~12GB GPUs
 
 # Optionally load from config (failure uses defaults above)
 try:
-    sys.path.insert(0, str(Path(__file__).parent))
+    _src_dir = str(Path(__file__).parent)
+    if _src_dir not in sys.path:
+        sys.path.insert(0, _src_dir)
     import config
     DEFAULT_MODEL = config.get('transcription', 'model', DEFAULT_MODEL)
     DEFAULT_RECORDINGS_DIR = config.get('directory', 'recordings_dir', DEFAULT_RECORDINGS_DIR)
@@ -39,6 +50,63 @@ try:
 except Exception:
     pass  # Use defaults - config loading is optional
 
+def transcribe_pending(wav_files, model_name, batch_size, transcripts_dir):
+    """
+    Transcribe WAV files through one shared batched pipeline.
+
+    The model is instantiated once and each file is fed through
+    faster-whisper's BatchedInferencePipeline, which transcribes
+    30-second chunks in parallel batches.
+
+    Args:
+        wav_files: List of Path objects to transcribe
+        model_name: Whisper model size ('tiny', 'base', ...)
+        batch_size: Number of audio chunks per inference batch
+        transcripts_dir: Directory to save transcripts
+
+    Returns:
+        Dict with counts: {'succeeded': int, 'failed': int}
+    """
+    from faster_whisper import BatchedInferencePipeline
+    from transcribe import _get_model
+
+    # Shared loader picks int8 on CPU / float16 on CUDA and caches
+    # the instance
+    pipeline = BatchedInferencePipeline(model=_get_model(model_name))
+
+    stats = {'succeeded': 0, 'failed': 0}
+
+    def write_transcript(wav_file, text):
+        markdown = generate_markdown(str(wav_file), text)
+        return save_markdown(str(wav_file), markdown, transcripts_dir)
+
+    # Inference stays on the main thread (CT2 manages its own locking);
+    # markdown metadata reads and writes overlap the next file's
+    # transcription in the executor.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        writes = []
+        for i, wav_file in enumerate(wav_files, 1):
+            print(f"[{i}/{len(wav_files)}] Processing: {wav_file.name}")
+            try:
+                segments, _info = pipeline.transcribe(str(wav_file), batch_size=batch_size)
+                text = "".join(segment.text for segment in segments)
+                writes.append((wav_file, executor.submit(write_transcript, wav_file, text)))
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"         Failed: {wav_file.name} - {e}")
+
+        for wav_file, future in writes:
+            try:
+                md_path = future.result()
+                stats['succeeded'] += 1
+                print(f"         Transcribed: {wav_file.name} → {md_path.name}")
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"         Failed: {wav_file.name} - {e}")
+
+    return stats
+
+
 def main():
     """Main entry point for batch transcription."""
     parser = argparse.ArgumentParser(
@@ -64,6 +132,13 @@ def main():
         help=f"Whisper model size (default: {DEFAULT_MODEL})"
     )
 
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Chunks per inference batch (default: {DEFAULT_BATCH_SIZE})"
+    )
+
     parser.add_argument(
         "--force",
         action="store_true",
@@ -91,31 +166,45 @@ def main():
         print(f"❌ Error: Directory not found: {args.dir}\n")
         return 1
 
-    # Count WAV files
-    wav_files = list(recordings_path.glob("*.wav"))
-    if not wav_files:
+    # One directory pass instead of a glob plus a per-file .md stat:
+    # partition entries into WAV and markdown stems, then set-difference
+    with os.scandir(recordings_path) as entries:
+        names = [e.name for e in entries if e.is_file()]
+    wav_stems = {n[:-4] for n in names if n.endswith('.wav')}
+    md_stems = {n[:-3] for n in names if n.endswith('.md')}
+
+    if not wav_stems:
         print(f"⚠️  No WAV files found in {args.dir}\n")
         return 0
 
-    print(f"Found {len(wav_files)} WAV file(s)\n")
+    # Transcripts may live in a separate directory
+    transcripts_path = Path(args.transcripts_dir)
+    if transcripts_path != recordings_path and transcripts_path.is_dir():
+        with os.scandir(transcripts_path) as entries:
+            md_stems |= {e.name[:-3] for e in entries if e.name.endswith('.md')}
+
+    pending_stems = wav_stems if args.force else wav_stems - md_stems
+    pending = [recordings_path / (stem + '.wav') for stem in sorted(pending_stems)]
+    skipped = len(wav_stems) - len(pending)
+
+    print(f"Found {len(wav_stems)} WAV file(s), {len(pending)} to transcribe\n")
 
     try:
-        # Run batch transcription
-        stats = transcribe_batch(
-            args.dir,
-            model=args.model,
-            force=args.force,
-            transcripts_dir=args.transcripts_dir
-        )
+        if pending:
+            stats = transcribe_pending(
+                pending, args.model, args.batch_size, args.transcripts_dir
+            )
+        else:
+            stats = {'succeeded': 0, 'failed': 0}
 
         # Print summary
         print(f"\n{'='*70}")
         print("Batch Transcription Complete")
         print(f"{'='*70}")
-        print(f"Total:     {stats['total']}")
+        print(f"Total:     {len(wav_stems)}")
         print(f"Succeeded: {stats['succeeded']}")
         print(f"Failed:    {stats['failed']}")
-        print(f"Skipped:   {stats['skipped']}")
+        print(f"Skipped:   {skipped}")
         print(f"{'='*70}\n")
 
         # Return appropriate exit code
@@ -8,6 +8,7 @@ Usage:
     import config
     threshold = config.get('recording', 'silence_threshold', 500)
 """
+import functools
 from pathlib import Path
 from typing import Any, Dict, Optional
 
@@ -35,9 +36,22 @@ DEFAULTS = {
 
 _config_cache: Optional[Dict] = None
 
+# Directories already created this process - avoids a stat+mkdir
+# syscall on every directory lookup
+_ensured_dirs: set = set()
 
+
+def _ensure_dir(dir_path: str) -> str:
+    """Create dir_path once per process, then skip the mkdir syscall."""
+    if dir_path not in _ensured_dirs:
+        Path(dir_path).mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(dir_path)
+    return dir_path
+
+
+@functools.lru_cache(maxsize=1)
 def _find_config_file() -> Optional[Path]:
-    """Find config.yaml in project root."""
+    """Find config.yaml in project root (result cached - one stat per process)."""
     src_dir = Path(__file__).parent
     project_root = src_dir.parent
     config_path = project_root / 'config.yaml'
@@ -109,19 +123,17 @@ def get(section: str, key: str, default: Any = None) -> Any:
 
 def get_recordings_dir() -> str:
     """Get recordings directory path (creates if needed)."""
-    dir_path = get('directory', 'recordings_dir', 'omi_recordings')
-    Path(dir_path).mkdir(parents=True, exist_ok=True)
-    return dir_path
+    return _ensure_dir(get('directory', 'recordings_dir', 'omi_recordings'))
 
 
 def get_transcripts_dir() -> str:
     """Get transcripts directory path (creates if needed)."""
-    dir_path = get('directory', 'transcripts_dir', 'omi_recordings')
-    Path(dir_path).mkdir(parents=True, exist_ok=True)
-    return dir_path
+    return _ensure_dir(get('directory', 'transcripts_dir', 'omi_recordings'))
 
 
 def reset_cache() -> None:
     """Reset config cache (useful for testing)."""
     global _config_cache
     _config_cache = None
+    _ensured_dirs.clear()
+    _find_config_file.cache_clear()
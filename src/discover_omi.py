@@ -10,7 +10,9 @@ DEVICE_DISCOVERY_TIMEOUT = 10.0
 
 # Optionally load from config (failure uses default above)
 try:
-    sys.path.insert(0, str(Path(__file__).parent))
+    _src_dir = str(Path(__file__).parent)
+    if _src_dir not in sys.path:
+        sys.path.insert(0, _src_dir)
     import config
     DEVICE_DISCOVERY_TIMEOUT = config.get('device', 'discovery_timeout', DEVICE_DISCOVERY_TIMEOUT)
 except Exception:
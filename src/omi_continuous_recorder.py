@@ -9,10 +9,25 @@ Runs until killed with Ctrl+C.
 Usage: python omi_continuous_recorder.py [device_uuid]
 If no UUID provided, will auto-discover available Omi devices.
 """
-import os, sys, glob, ctypes, asyncio, wave, struct
+import os, sys, glob, ctypes, asyncio, io, time, wave
+import numpy as np
 from datetime import datetime
 from pathlib import Path
 from collections import deque
+from bleak import BleakClient, BleakScanner
+
+# Bound once so the per-packet path gets a direct C call instead of an
+# event-loop lookup
+_monotonic = time.monotonic
+
+# Optionally use uvloop to cut asyncio scheduling overhead on the
+# ~50Hz notification path (failure falls back to the default loop)
+if sys.platform != 'win32':
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass  # Default asyncio loop works fine - uvloop is optional
 
 # Accept device UUID as command line argument or auto-discover
 DEVICE_UUID = sys.argv[1] if len(sys.argv) > 1 else None
@@ -28,7 +43,9 @@ DEVICE_DISCOVERY_TIMEOUT = 10.0
 
 # Optionally load from config (failure uses defaults above)
 try:
-    sys.path.insert(0, str(Path(__file__).parent))
+    _src_dir = str(Path(__file__).parent)
+    if _src_dir not in sys.path:
+        sys.path.insert(0, _src_dir)
     import config
     SILENCE_THRESHOLD = config.get('recording', 'silence_threshold', SILENCE_THRESHOLD)
     SILENCE_DURATION = config.get('recording', 'silence_duration', SILENCE_DURATION)
@@ -43,10 +60,54 @@ print("Omi Continuous Recorder")
 print("=" * 70)
 print()
 
+
+# The resolved library path is stable per machine; remember it across
+# runs so startup needs one stat instead of a directory scan
+_OPUS_PATH_CACHE = Path.home() / '.cache' / 'omi-recorder' / 'opus_path'
+
+
+def _find_opus_path():
+    """Resolve the libopus path, cheapest probe first"""
+    # Explicit override wins (useful for non-Homebrew installs)
+    env_path = os.environ.get('OPUS_LIBRARY')
+    if env_path and os.path.exists(env_path):
+        return env_path
+
+    # Path cached by a previous run (revalidated before use)
+    try:
+        cached = _OPUS_PATH_CACHE.read_text().strip()
+        if cached and os.path.exists(cached):
+            return cached
+    except OSError:
+        pass
+
+    # The unversioned path is a single stat; glob only for the
+    # versioned Cellar layout
+    path = "/opt/homebrew/lib/libopus.0.dylib"
+    if not os.path.exists(path):
+        matches = glob.glob("/opt/homebrew/Cellar/opus/*/lib/libopus.0.dylib")
+        path = matches[0] if matches else None
+
+    if path:
+        try:
+            _OPUS_PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            _OPUS_PATH_CACHE.write_text(path)
+        except OSError:
+            pass  # Cache is best-effort
+    return path
+
+
+def _probe_and_load_opus():
+    """Locate and load libopus (returns None if not installed)"""
+    path = _find_opus_path()
+    if path:
+        return ctypes.CDLL(path)
+    return None
+
+
 # Auto-discover device if UUID not provided
 if not DEVICE_UUID:
     print("Scanning for Omi devices...")
-    from bleak import BleakScanner
 
     async def discover_device():
         devices = await BleakScanner.discover(timeout=DEVICE_DISCOVERY_TIMEOUT)
@@ -72,30 +133,29 @@ if not DEVICE_UUID:
             print("Invalid selection")
             sys.exit(1)
 
-    DEVICE_UUID = asyncio.run(discover_device())
+    async def startup():
+        # The opus probe (glob + dlopen) hides entirely behind the
+        # ~10s BLE scan - the two are independent.
+        # run_in_executor rather than to_thread: Python 3.8 support
+        loop = asyncio.get_event_loop()
+        return await asyncio.gather(
+            discover_device(),
+            loop.run_in_executor(None, _probe_and_load_opus))
+
+    DEVICE_UUID, libopus = asyncio.run(startup())
     print()
+else:
+    libopus = _probe_and_load_opus()
 
-# Load Opus
-opus_path = None
-for pattern in ["/opt/homebrew/Cellar/opus/*/lib/libopus.0.dylib",
-                "/opt/homebrew/lib/libopus.0.dylib"]:
-    matches = glob.glob(pattern)
-    if matches:
-        opus_path = matches[0]
-        ctypes.CDLL(opus_path)
-        break
-
-if not opus_path:
+if libopus is None:
     print("Opus library not found! Install: brew install opus")
     sys.exit(1)
 
-from bleak import BleakClient
-
 # Setup Opus decoder
-libopus = ctypes.CDLL(opus_path)
 libopus.opus_decoder_create.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int)]
 libopus.opus_decoder_create.restype = ctypes.c_void_p
-libopus.opus_decode.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_ubyte), ctypes.c_int,
+# c_char_p lets raw bytes marshal directly - no per-packet ctypes.cast
+libopus.opus_decode.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int,
                                  ctypes.POINTER(ctypes.c_int16), ctypes.c_int, ctypes.c_int]
 libopus.opus_decode.restype = ctypes.c_int
 
@@ -109,60 +169,107 @@ if error.value != 0:
 class AutoRecorder:
     def __init__(self):
         self.is_recording = False
-        self.decoded_pcm = []
+        self.decoded_bytes = 0
         self.recording_count = 0
+        # Open WAV for the active session (frames stream in as they
+        # arrive, so memory stays flat regardless of session length)
+        self._wav = None
+        self._wav_file = None
+        self._wav_path = None
         self.output_dir = Path(RECORDINGS_DIR)
         self.output_dir.mkdir(exist_ok=True)
-        self.running = True
+        self._stop_event = asyncio.Event()
 
         # Voice activity detection
         self.last_speech_time = 0
         self.recording_start_time = 0
         self.pre_buffer = deque(maxlen=10)  # Keep ~0.5s of audio before speech
 
+        # Packets queue from the BLE callback to the decode worker so
+        # the callback returns immediately (bounded to cap memory if
+        # the worker ever falls behind)
+        self._packet_queue = asyncio.Queue(maxsize=256)
+
         # Stats
         self.total_packets = 0
+        self._last_print = 0.0  # Throttles the progress-bar redraws
+
+        # Bind config-derived globals once so the hot callback reads
+        # instance attributes instead of doing module-global lookups
+        self._silence_threshold = SILENCE_THRESHOLD
+        self._silence_duration = SILENCE_DURATION
+
+        # Reusable decode buffer - avoids a fresh 1.9KB ctypes allocation
+        # per BLE packet (~50/s)
+        self._pcm_buf = (ctypes.c_int16 * 960)()
 
     def decode_opus(self, data: bytes) -> bytes:
         """Decode Opus packet to PCM"""
         if len(data) <= 3:
             return b''
         audio_data = data[3:]
-        try:
-            input_buffer = ctypes.cast(audio_data, ctypes.POINTER(ctypes.c_ubyte))
-            pcm_buffer = (ctypes.c_int16 * 960)()
-            samples = libopus.opus_decode(opus_decoder, input_buffer, len(audio_data),
-                                          pcm_buffer, 960, 0)
-            if samples > 0:
-                return ctypes.string_at(pcm_buffer, samples * 2)
-        except:
-            pass
-        return b''
-
-    def get_audio_level(self, pcm_data: bytes) -> float:
-        """Calculate RMS audio level from PCM data"""
-        if len(pcm_data) < 2:
-            return 0
-
-        # Convert bytes to 16-bit samples
-        samples = struct.unpack(f'<{len(pcm_data)//2}h', pcm_data)
-
-        # Calculate RMS
-        sum_squares = sum(s * s for s in samples)
-        rms = (sum_squares / len(samples)) ** 0.5
-        return rms
+        samples = libopus.opus_decode(opus_decoder, audio_data, len(audio_data),
+                                      self._pcm_buf, 960, 0)
+        if samples <= 0:
+            # Negative = opus error code (malformed packet); skip it
+            return b''
+        return ctypes.string_at(self._pcm_buf, samples * 2)
+
+    def get_audio_level(self, pcm_data: bytes, stride: int = 1) -> float:
+        """Calculate RMS audio level from PCM data.
+
+        stride > 1 subsamples for a coarse-but-cheap estimate, enough
+        to gate speech detection during long silent stretches.
+        """
+        samples = np.frombuffer(pcm_data, dtype=np.int16)[::stride]
+        if samples.size == 0:
+            return 0.0
+
+        # Upcast before squaring so int16 values can't overflow
+        return float(np.sqrt(np.mean(samples.astype(np.int32) ** 2)))
 
     def handle_audio(self, sender, data: bytearray):
-        """Handle incoming audio packet"""
+        """BLE notification callback - enqueue packet and return"""
         self.total_packets += 1
-        now = asyncio.get_event_loop().time()
+        # Header-only packets carry no audio; skip the bytes() copy
+        # and the queue round-trip entirely
+        if len(data) <= 3:
+            return
+        try:
+            self._packet_queue.put_nowait(bytes(data))
+        except asyncio.QueueFull:
+            # Drop the oldest packet rather than block the callback
+            self._packet_queue.get_nowait()
+            self._packet_queue.put_nowait(bytes(data))
+
+    async def _decode_worker(self):
+        """Drain the packet queue, decoding and running voice detection"""
+        while True:
+            self.process_packet(await self._packet_queue.get())
+
+            # If a burst queued up, decode back-to-back (bounded so a
+            # sustained backlog still yields to the event loop)
+            for _ in range(16):
+                try:
+                    data = self._packet_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                self.process_packet(data)
 
-        pcm = self.decode_opus(bytes(data))
+    def process_packet(self, data: bytes):
+        """Decode one packet and update recording state"""
+        now = _monotonic()
+
+        pcm = self.decode_opus(data)
         if not pcm:
             return
 
-        level = self.get_audio_level(pcm)
-        is_speech = level > SILENCE_THRESHOLD
+        # Idle: a strided estimate is enough to spot speech onset.
+        # Recording: full resolution keeps silence detection and the
+        # progress bar accurate.
+        stride = 1 if self.is_recording else 4
+        level = self.get_audio_level(pcm, stride=stride)
+        is_speech = level > self._silence_threshold
 
         if is_speech:
             self.last_speech_time = now
@@ -175,58 +282,83 @@ class AutoRecorder:
             if is_speech:
                 self.is_recording = True
                 self.recording_start_time = now
-                # Add pre-buffer to recording
-                self.decoded_pcm = list(self.pre_buffer)
+                # Open the session file and flush the pre-buffer into it
+                self._open_wav()
+                prelude = b''.join(self.pre_buffer)
+                self._wav.writeframes(prelude)
+                self.decoded_bytes = len(prelude)
                 self.pre_buffer.clear()
                 print("\r" + " " * 70, end="\r")
                 print("Recording started (speech detected)...", flush=True)
 
         else:
-            # Currently recording
-            self.decoded_pcm.append(pcm)
+            # Currently recording - stream straight into the open WAV
+            self._wav.writeframes(pcm)
+            self.decoded_bytes += len(pcm)
 
             # Check for silence timeout
             silence_duration = now - self.last_speech_time
             duration = now - self.recording_start_time
 
-            if silence_duration > SILENCE_DURATION:
+            if silence_duration > self._silence_duration:
                 # End recording session, save file
                 print()
                 self.save_recording()
                 self.is_recording = False
-                self.decoded_pcm = []
+                self.decoded_bytes = 0
                 print()
                 print("Session saved. Waiting for next speech...", flush=True)
             else:
-                # Show progress
-                bar_len = min(int(level / 200), 30)
-                bar = "" * bar_len
-                status = "SPEECH" if is_speech else "silent"
-                print(f"\r  Recording: {duration:.1f}s | {status:6} | {bar:<30} |", end="", flush=True)
+                # Show progress - redraw at most 4Hz by wallclock, so
+                # packet bursts can't flood the terminal; terminal
+                # writes are synchronous syscalls
+                if now - self._last_print >= 0.25:
+                    self._last_print = now
+                    bar_len = min(int(level / 200), 30)
+                    bar = "" * bar_len
+                    status = "SPEECH" if is_speech else "silent"
+                    sys.stdout.write(f"\r  Recording: {duration:.1f}s | {status:6} | {bar:<30} |")
+                    sys.stdout.flush()
+
+    def stop(self):
+        """Request a graceful shutdown of the run loop"""
+        self._stop_event.set()
+
+    def _open_wav(self):
+        """Open a new session WAV file for incremental writes"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._wav_path = self.output_dir / f"omi_auto_{timestamp}.wav"
+        # A large write buffer coalesces the per-packet writeframes
+        # calls into ~1MiB syscalls
+        raw = open(self._wav_path, 'wb', buffering=0)
+        self._wav_file = io.BufferedWriter(raw, buffer_size=1 << 20)
+        self._wav = wave.open(self._wav_file, 'wb')
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(SAMPLE_RATE)
 
     def save_recording(self):
-        """Save the current recording to a WAV file"""
-        if not self.decoded_pcm:
+        """Finalize the current session WAV file"""
+        if self._wav is None:
             return None
 
-        total_bytes = sum(len(p) for p in self.decoded_pcm)
-        duration = (total_bytes // 2) / SAMPLE_RATE
+        # wave won't close a caller-supplied file object, so close the
+        # buffered writer ourselves after the header is patched
+        self._wav.close()
+        self._wav_file.close()
+        self._wav = None
+        self._wav_file = None
+        wav_file = self._wav_path
+        self._wav_path = None
+
+        duration = (self.decoded_bytes // 2) / SAMPLE_RATE
 
         if duration < MIN_RECORDING_DURATION:
             print(f"  Recording too short ({duration:.1f}s), discarding")
+            wav_file.unlink(missing_ok=True)
             return None
 
         self.recording_count += 1
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        wav_file = self.output_dir / f"omi_auto_{timestamp}.wav"
-
-        with wave.open(str(wav_file), 'wb') as wav:
-            wav.setnchannels(1)
-            wav.setsampwidth(2)
-            wav.setframerate(SAMPLE_RATE)
-            for pcm in self.decoded_pcm:
-                wav.writeframes(pcm)
-
         file_size = wav_file.stat().st_size
         print(f"  Saved: {wav_file.name} ({duration:.1f}s, {file_size/1024:.1f}KB)")
         return wav_file
@@ -250,18 +382,21 @@ class AutoRecorder:
                 print()
                 print("Waiting for speech...")
 
+                decode_task = asyncio.create_task(self._decode_worker())
                 await client.start_notify(AUDIO_CHAR_UUID, self.handle_audio)
 
                 try:
-                    while self.running:
-                        await asyncio.sleep(0.1)
+                    # Sleeps until stop() or cancellation - no periodic
+                    # wakeups while idle
+                    await self._stop_event.wait()
                 except asyncio.CancelledError:
                     pass
 
                 await client.stop_notify(AUDIO_CHAR_UUID)
+                decode_task.cancel()
 
                 # Save any remaining recording
-                if self.is_recording and self.decoded_pcm:
+                if self.is_recording and self._wav:
                     print()
                     self.save_recording()
 
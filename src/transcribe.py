@@ -2,8 +2,9 @@
 """
 Transcription module for Omi Audio Recorder
 
-Provides functions to transcribe WAV files using OpenAI Whisper
-and generate markdown files with metadata and transcription text.
+Provides functions to transcribe WAV files using Whisper via
+faster-whisper (CTranslate2 backend) and generate markdown files
+with metadata and transcription text.
 
 Features:
 - Local transcription using Whisper base model
@@ -13,15 +14,19 @@ Features:
 """
 
 import os
+import re
+import struct
 import wave
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
-import whisper
+from typing import Any, Dict, Optional, Tuple, Union
+from faster_whisper import WhisperModel
 
 
-def get_audio_metadata(wav_path: str) -> Dict[str, Any]:
+def get_audio_metadata(wav_path: Union[str, Path]) -> Dict[str, Any]:
     """
     Extract metadata from WAV file.
 
@@ -31,7 +36,7 @@ def get_audio_metadata(wav_path: str) -> Dict[str, Any]:
     Returns:
         Dict containing: duration, file_size, sample_rate, channels, recorded_at
     """
-    wav_path = Path(wav_path)
+    wav_path = wav_path if isinstance(wav_path, Path) else Path(wav_path)
 
     # Extract timestamp from filename
     # Format: omi_auto_YYYYMMDD_HHMMSS.wav
@@ -50,13 +55,24 @@ def get_audio_metadata(wav_path: str) -> Dict[str, Any]:
     else:
         recorded_at = datetime.now().isoformat()
 
-    # Get duration and sample rate from WAV file
+    # Get duration and sample rate from the fixed 44-byte PCM header -
+    # one small read instead of wave's Python-level chunk walker
     try:
-        with wave.open(wav_path, 'rb') as wav_file:
-            frames = wav_file.getnframes()
-            sample_rate = wav_file.getframerate()
-            channels = wav_file.getnchannels()
-            duration = frames / sample_rate
+        with open(wav_path, 'rb') as f:
+            header = f.read(44)
+        if (len(header) == 44 and header[:4] == b'RIFF'
+                and header[8:12] == b'WAVE' and header[36:40] == b'data'):
+            channels, sample_rate = struct.unpack_from('<HI', header, 22)
+            byte_rate, = struct.unpack_from('<I', header, 28)
+            data_size, = struct.unpack_from('<I', header, 40)
+            duration = data_size / byte_rate
+        else:
+            # Non-canonical chunk layout - let wave walk the chunks
+            with wave.open(str(wav_path), 'rb') as wav_file:
+                frames = wav_file.getnframes()
+                sample_rate = wav_file.getframerate()
+                channels = wav_file.getnchannels()
+                duration = frames / sample_rate
     except Exception as e:
         print(f"Warning: Could not read WAV metadata from {wav_path}: {e}")
         duration = 0
@@ -75,12 +91,50 @@ def get_audio_metadata(wav_path: str) -> Dict[str, Any]:
     }
 
 
-def transcribe_audio(wav_path: str, model: str = "base") -> str:
+# Loaded models keyed by size name - a batch run loads the weights
+# once instead of once per file
+_MODEL_CACHE: Dict[str, WhisperModel] = {}
+
+_compute_type: Optional[str] = None
+
+
+def _pick_compute_type() -> str:
+    """Pick the fastest precision for the available hardware.
+
+    float16 on CUDA halves memory bandwidth on the transformer
+    matmuls; int8 is the fastest rung on CPU (uses VNNI when
+    available). Decided once per process.
     """
-    Transcribe a WAV file using OpenAI Whisper.
+    global _compute_type
+    if _compute_type is None:
+        try:
+            import ctranslate2
+            has_gpu = ctranslate2.get_cuda_device_count() > 0
+        except Exception:
+            has_gpu = False
+        _compute_type = 'float16' if has_gpu else 'int8'
+    return _compute_type
+
+
+def _get_model(model: str) -> WhisperModel:
+    """Load a Whisper model once per process and reuse it."""
+    instance = _MODEL_CACHE.get(model)
+    if instance is None:
+        print(f"  Loading Whisper {model} model...")
+        instance = WhisperModel(model, device='auto',
+                                compute_type=_pick_compute_type())
+        _MODEL_CACHE[model] = instance
+    return instance
 
-    Supports offline mode if model is already cached locally.
-    Model cache location: ~/.cache/whisper/base.pt
+
+def transcribe_audio(wav_path: Union[str, Path], model: str = "base") -> str:
+    """
+    Transcribe a WAV file using Whisper (faster-whisper backend).
+
+    faster-whisper runs the same models 2-4x faster on CPU than
+    openai-whisper at identical accuracy, with int8 quantization
+    halving memory. Supports offline mode if the model is already
+    cached locally (Hugging Face hub cache under ~/.cache)
 
     Args:
         wav_path: Path to WAV file to transcribe
@@ -94,22 +148,20 @@ def transcribe_audio(wav_path: str, model: str = "base") -> str:
         FileNotFoundError: If WAV file doesn't exist
         Exception: If transcription fails
     """
-    wav_path = Path(wav_path)
+    wav_path = wav_path if isinstance(wav_path, Path) else Path(wav_path)
 
     if not wav_path.exists():
         raise FileNotFoundError(f"WAV file not found: {wav_path}")
 
     try:
-        # Load Whisper model
-        # Supports offline mode if ~/.cache/whisper/{model}.pt exists
-        print(f"  Loading Whisper {model} model...")
-        model_instance = whisper.load_model(model)
+        # Load Whisper model (cached - model names map 1:1 to openai-whisper's)
+        model_instance = _get_model(model)
 
-        # Transcribe
+        # Transcribe (segments are decoded lazily; join materializes them)
         print(f"  Transcribing {wav_path.name}...")
-        result = model_instance.transcribe(str(wav_path))
+        segments, _info = model_instance.transcribe(str(wav_path))
 
-        return result['text']
+        return "".join(segment.text for segment in segments)
 
     except Exception as e:
         raise Exception(f"Transcription failed for {wav_path.name}: {e}")
@@ -125,13 +177,13 @@ def format_file_size(size_bytes: int) -> str:
     Returns:
         Formatted size string (e.g., "265.3 KB", "1.2 MB")
     """
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            if unit == 'B':
-                return f"{int(size_bytes)} {unit}"
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.1f} TB"
+    if size_bytes < 1024:
+        return f"{int(size_bytes)} B"
+
+    units = ('KB', 'MB', 'GB', 'TB')
+    # bit_length picks the unit directly - no division loop
+    k = min((size_bytes.bit_length() - 1) // 10, len(units))
+    return f"{size_bytes / (1 << (10 * k)):.1f} {units[k - 1]}"
 
 
 def format_duration(seconds: float) -> str:
@@ -152,6 +204,11 @@ def format_duration(seconds: float) -> str:
     return f"{minutes}m {remaining_seconds:.0f}s"
 
 
+# Unicode ranges for common RTL languages: Hebrew, Arabic,
+# Arabic Supplement, Arabic Extended-A
+_RTL_RE = re.compile(r'[\u0590-\u05FF\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]')
+
+
 def detect_rtl_text(text: str) -> bool:
     """
     Detect if text contains right-to-left characters (Arabic, Hebrew, etc).
@@ -162,20 +219,7 @@ def detect_rtl_text(text: str) -> bool:
     Returns:
         True if RTL text detected, False otherwise
     """
-    # Unicode ranges for common RTL languages
-    rtl_ranges = [
-        (0x0590, 0x05FF),    # Hebrew
-        (0x0600, 0x06FF),    # Arabic
-        (0x0750, 0x077F),    # Arabic Supplement
-        (0x08A0, 0x08FF),    # Arabic Extended-A
-    ]
-
-    for char in text:
-        code = ord(char)
-        for start, end in rtl_ranges:
-            if start <= code <= end:
-                return True
-    return False
+    return _RTL_RE.search(text) is not None
 
 
 def format_transcription_text(text: str) -> str:
@@ -198,20 +242,24 @@ def format_transcription_text(text: str) -> str:
     return text
 
 
-def generate_markdown(wav_path: str, transcription_text: str) -> str:
+def generate_markdown(wav_path: Union[str, Path], transcription_text: str,
+                      metadata: Optional[Dict[str, Any]] = None) -> str:
     """
     Generate markdown content with metadata and transcription.
 
     Args:
         wav_path: Path to WAV file
         transcription_text: Transcribed text from Whisper
+        metadata: Precomputed get_audio_metadata result (avoids
+                  re-reading the WAV when the caller already has it)
 
     Returns:
         Markdown formatted string
     """
-    wav_path = Path(wav_path)
+    wav_path = wav_path if isinstance(wav_path, Path) else Path(wav_path)
     filename = wav_path.stem
-    metadata = get_audio_metadata(str(wav_path))
+    if metadata is None:
+        metadata = get_audio_metadata(wav_path)
 
     # Parse recorded_at for display
     recorded_at = metadata['recorded_at']
@@ -247,13 +295,13 @@ def generate_markdown(wav_path: str, transcription_text: str) -> str:
 {formatted_text}
 
 ---
-*Automatically transcribed using OpenAI Whisper*
+*Automatically transcribed using Whisper (faster-whisper)*
 """
 
     return markdown
 
 
-def save_markdown(wav_path: str, markdown_content: str, transcripts_dir: str = None) -> Path:
+def save_markdown(wav_path: Union[str, Path], markdown_content: str, transcripts_dir: str = None) -> Path:
     """
     Save markdown file to specified directory or alongside WAV file.
 
@@ -272,7 +320,7 @@ def save_markdown(wav_path: str, markdown_content: str, transcripts_dir: str = N
     Raises:
         IOError: If file write fails
     """
-    wav_path = Path(wav_path)
+    wav_path = wav_path if isinstance(wav_path, Path) else Path(wav_path)
 
     if transcripts_dir:
         transcripts_path = Path(transcripts_dir)
@@ -289,7 +337,7 @@ def save_markdown(wav_path: str, markdown_content: str, transcripts_dir: str = N
         raise IOError(f"Failed to save markdown file: {md_path}") from e
 
 
-def should_transcribe(wav_path: str, force: bool = False, transcripts_dir: str = None) -> bool:
+def should_transcribe(wav_path: Union[str, Path], force: bool = False, transcripts_dir: str = None) -> bool:
     """
     Determine if a WAV file should be transcribed.
 
@@ -306,7 +354,7 @@ def should_transcribe(wav_path: str, force: bool = False, transcripts_dir: str =
     if force:
         return True
 
-    wav_path = Path(wav_path)
+    wav_path = wav_path if isinstance(wav_path, Path) else Path(wav_path)
 
     # Check transcripts_dir first if specified
     if transcripts_dir:
@@ -321,7 +369,7 @@ def should_transcribe(wav_path: str, force: bool = False, transcripts_dir: str =
 
 
 def transcribe_file(
-    wav_path: str,
+    wav_path: Union[str, Path],
     model: str = "base",
     force: bool = False,
     transcripts_dir: str = None
@@ -338,21 +386,24 @@ def transcribe_file(
     Returns:
         Tuple of (success: bool, message: Optional[str])
     """
-    wav_path = Path(wav_path)
+    wav_path = wav_path if isinstance(wav_path, Path) else Path(wav_path)
 
     # Check if should transcribe
-    if not should_transcribe(str(wav_path), force, transcripts_dir):
+    if not should_transcribe(wav_path, force, transcripts_dir):
         return True, f"Already transcribed: {wav_path.name}"
 
     try:
+        # Read metadata once, up front, and pass it through
+        metadata = get_audio_metadata(wav_path)
+
         # Transcribe
-        transcription = transcribe_audio(str(wav_path), model)
+        transcription = transcribe_audio(wav_path, model)
 
         # Generate markdown
-        markdown = generate_markdown(str(wav_path), transcription)
+        markdown = generate_markdown(wav_path, transcription, metadata)
 
         # Save markdown
-        md_path = save_markdown(str(wav_path), markdown, transcripts_dir)
+        md_path = save_markdown(wav_path, markdown, transcripts_dir)
 
         return True, f"Transcribed: {wav_path.name} → {md_path.name}"
 
@@ -360,11 +411,23 @@ def transcribe_file(
         return False, f"Failed: {wav_path.name} - {str(e)}"
 
 
+def _record_result(stats: Dict[str, int], success: bool, message: Optional[str]) -> None:
+    """Fold one transcribe_file result into the stats dict."""
+    if success:
+        if "Already transcribed" in message:
+            stats['skipped'] += 1
+        else:
+            stats['succeeded'] += 1
+    else:
+        stats['failed'] += 1
+
+
 def batch_transcribe(
     recordings_dir: str = "omi_recordings",
     model: str = "base",
     force: bool = False,
-    transcripts_dir: str = None
+    transcripts_dir: str = None,
+    max_workers: int = 1
 ) -> Dict[str, int]:
     """
     Batch transcribe all WAV files in a directory.
@@ -376,6 +439,8 @@ def batch_transcribe(
         model: Whisper model to use (default: 'base')
         force: If True, re-transcribe all files even if .md exists
         transcripts_dir: Directory to save transcripts (if None, saves alongside WAV)
+        max_workers: Worker threads; >1 overlaps file I/O with inference
+                     (the model is shared, so keep this modest on CPU)
 
     Returns:
         Dict with counts: {'total': int, 'succeeded': int, 'failed': int, 'skipped': int}
@@ -385,8 +450,19 @@ def batch_transcribe(
     if not recordings_path.exists():
         raise FileNotFoundError(f"Recordings directory not found: {recordings_dir}")
 
-    # Find all WAV files
-    wav_files = sorted(recordings_path.glob("*.wav"))
+    # One scandir pass finds the WAVs (no fnmatch, no Path objects for
+    # non-matches) and collects existing transcript stems so the loop
+    # below skips without a per-file exists() stat
+    with os.scandir(recordings_path) as it:
+        names = [e.name for e in it if e.is_file()]
+    wav_files = sorted(recordings_path / n for n in names if n.endswith('.wav'))
+    md_stems = {n[:-3] for n in names if n.endswith('.md')}
+
+    if transcripts_dir:
+        transcripts_path = Path(transcripts_dir)
+        if transcripts_path != recordings_path and transcripts_path.is_dir():
+            with os.scandir(transcripts_path) as it:
+                md_stems |= {e.name[:-3] for e in it if e.name.endswith('.md')}
 
     if not wav_files:
         return {'total': 0, 'succeeded': 0, 'failed': 0, 'skipped': 0}
@@ -395,18 +471,40 @@ def batch_transcribe(
 
     print(f"\nBatch transcribing {len(wav_files)} file(s) from {recordings_dir}/\n")
 
+    if max_workers > 1:
+        # Load the model up front so workers share the cached instance
+        _get_model(model)
+        lock = threading.Lock()
+        done_count = [0]
+
+        def process(wav_file):
+            if not force and wav_file.stem in md_stems:
+                success, message = True, f"Already transcribed: {wav_file.name}"
+            else:
+                success, message = transcribe_file(wav_file, model, force, transcripts_dir)
+            with lock:
+                done_count[0] += 1
+                print(f"[{done_count[0]}/{len(wav_files)}] {wav_file.name}")
+                _record_result(stats, success, message)
+                if message:
+                    print(f"         {message}")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(process, wav_files))
+
+        return stats
+
     for i, wav_file in enumerate(wav_files, 1):
         print(f"[{i}/{len(wav_files)}] Processing: {wav_file.name}")
 
-        success, message = transcribe_file(str(wav_file), model, force, transcripts_dir)
+        if not force and wav_file.stem in md_stems:
+            stats['skipped'] += 1
+            print(f"         Already transcribed: {wav_file.name}")
+            continue
 
-        if success:
-            if "Already transcribed" in message:
-                stats['skipped'] += 1
-            else:
-                stats['succeeded'] += 1
-        else:
-            stats['failed'] += 1
+        success, message = transcribe_file(wav_file, model, force, transcripts_dir)
+
+        _record_result(stats, success, message)
 
         if message:
             print(f"         {message}")
@@ -420,14 +518,24 @@ if __name__ == "__main__":
 
     if len(sys.argv) < 2:
         print("Usage: python transcribe.py <wav_file>")
-        print("       python transcribe.py --batch [recordings_dir] [--force]")
+        print("       python transcribe.py --batch [recordings_dir] [--force] [--workers N]")
         sys.exit(1)
 
     if sys.argv[1] == "--batch":
-        recordings_dir = sys.argv[2] if len(sys.argv) > 2 else "omi_recordings"
+        recordings_dir = "omi_recordings"
+        if len(sys.argv) > 2 and not sys.argv[2].startswith('--'):
+            recordings_dir = sys.argv[2]
         force = "--force" in sys.argv
 
-        stats = batch_transcribe(recordings_dir, force=force)
+        max_workers = 1
+        if "--workers" in sys.argv:
+            try:
+                max_workers = int(sys.argv[sys.argv.index("--workers") + 1])
+            except (IndexError, ValueError):
+                print("Usage: --workers expects a number, e.g. --workers 4")
+                sys.exit(1)
+
+        stats = batch_transcribe(recordings_dir, force=force, max_workers=max_workers)
 
         print(f"\n{'='*70}")
         print("Batch Transcription Complete")